@@ -10,9 +10,40 @@ import lbc
 import json
 import logging
 import os
+import re
 import asyncio
-from typing import Any, Optional, Dict, List
+import atexit
+import collections
+import functools
+import time
+from typing import Any, Callable, Optional, Dict, List, Union
 from datetime import datetime, timedelta
+from urllib.parse import quote, unquote, urlparse
+
+# Optional faster event loop (libuv-based), falls back to asyncio default loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional fast JSON encoder, falls back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional HTTP client for location geocoding (not a declared dependency);
+# without it, locations fall back to Paris coordinates
+try:
+    import requests
+except ImportError:
+    requests = None
+
+# Apify SDK is resolved once at import; None means local execution
+try:
+    from apify import Actor
+except ImportError:
+    Actor = None
 
 
 # ============================================================================
@@ -25,36 +56,126 @@ class ApifyAdapter:
     @staticmethod
     async def get_input() -> Dict[str, Any]:
         """Load input from Apify or local JSON file."""
-        try:
-            from apify import Actor
+        if Actor is not None:
             return await Actor.get_input() or {}
-        except (ImportError, Exception):
-            # Fallback to local file for testing
-            if os.path.exists("apify_input.json"):
-                with open("apify_input.json", "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return {}
+        
+        # Fallback to local file for testing
+        if os.path.exists("apify_input.json"):
+            with open("apify_input.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+    
+    # Local fallback dataset, one JSON object per line (append-only)
+    LOCAL_OUTPUT_FILE = "apify_output.ndjson"
+    _local_file = None  # Opened once, on first local push
     
     @staticmethod
-    async def push_data(data: Dict[str, Any]) -> None:
-        """Push data to Apify dataset or local file."""
-        try:
-            from apify import Actor
+    def dumps(data: Any, indent: bool = False) -> bytes:
+        """Serialize data to UTF-8 JSON bytes (orjson when available)."""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(data, option=option)
+        return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+    
+    @staticmethod
+    def dumps_line(data: Any) -> bytes:
+        """Serialize data to one NDJSON line (newline appended by the encoder)."""
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return json.dumps(data, ensure_ascii=False).encode("utf-8") + b"\n"
+    
+    @staticmethod
+    async def push_data(data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> None:
+        """Push one item or a batch of items to Apify dataset or local file."""
+        if Actor is not None:
             await Actor.push_data(data)
-        except (ImportError, Exception):
-            # Fallback to local storage
-            output_file = "apify_output.json"
-            existing = []
-            if os.path.exists(output_file):
-                try:
-                    with open(output_file, "r", encoding="utf-8") as f:
-                        existing = json.load(f)
-                except:
-                    pass
-            
-            existing.append(data)
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(existing, f, ensure_ascii=False, indent=2)
+            return
+        
+        # Fallback to local storage: append lines, never rewrite the file
+        if ApifyAdapter._local_file is None:
+            ApifyAdapter._local_file = open(ApifyAdapter.LOCAL_OUTPUT_FILE, "ab", buffering=1 << 16)
+            atexit.register(ApifyAdapter._local_file.close)
+        items = data if isinstance(data, list) else [data]
+        ApifyAdapter._local_file.write(b"".join(map(ApifyAdapter.dumps_line, items)))
+    
+    # Items coalesced across concurrent searches before being pushed
+    PUSH_BATCH_SIZE = 500
+    PUSH_INTERVAL_SECONDS = 15
+    _pending: List[Dict[str, Any]] = []
+    _last_flush = time.monotonic()
+    
+    # Full batches go to one background pusher so scraping continues during the
+    # dataset upload (bounded: producers wait once this many batches are queued)
+    PUSH_QUEUE_SIZE = 4
+    _push_queue: Optional[asyncio.Queue] = None
+    _push_worker: Optional[asyncio.Task] = None
+    
+    # Batches whose push failed, so the run summary does not count them as scraped
+    _failed_batches = 0
+    _failed_items = 0
+    
+    @staticmethod
+    async def _push_or_record(batch: List[Dict[str, Any]]) -> None:
+        """Push a batch; on failure log and record it instead of raising."""
+        try:
+            await ApifyAdapter.push_data(batch)
+        except Exception as e:
+            ApifyAdapter._failed_batches += 1
+            ApifyAdapter._failed_items += len(batch)
+            logging.getLogger("scraper").error(f"Failed to push {len(batch)} items: {e}")
+    
+    @staticmethod
+    def pop_push_failures() -> tuple[int, int]:
+        """Return (failed batches, failed items) recorded since the last call and reset them."""
+        failures = (ApifyAdapter._failed_batches, ApifyAdapter._failed_items)
+        ApifyAdapter._failed_batches = ApifyAdapter._failed_items = 0
+        return failures
+    
+    @staticmethod
+    async def _push_worker_loop(queue: asyncio.Queue) -> None:
+        """Push queued batches in order until the None sentinel is received."""
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            await ApifyAdapter._push_or_record(batch)
+    
+    @staticmethod
+    async def push_batched(items: List[Dict[str, Any]]) -> None:
+        """Queue items and hand them to the background pusher once the batch is full or old enough."""
+        ApifyAdapter._pending.extend(items)
+        if (len(ApifyAdapter._pending) < ApifyAdapter.PUSH_BATCH_SIZE
+                and time.monotonic() - ApifyAdapter._last_flush < ApifyAdapter.PUSH_INTERVAL_SECONDS):
+            return
+        
+        # Swap the buffer before awaiting so concurrent producers start a new batch
+        batch, ApifyAdapter._pending = ApifyAdapter._pending, []
+        ApifyAdapter._last_flush = time.monotonic()
+        
+        # Start the pusher lazily (needs a running event loop)
+        if ApifyAdapter._push_worker is None:
+            ApifyAdapter._push_queue = asyncio.Queue(maxsize=ApifyAdapter.PUSH_QUEUE_SIZE)
+            ApifyAdapter._push_worker = asyncio.create_task(ApifyAdapter._push_worker_loop(ApifyAdapter._push_queue))
+        await ApifyAdapter._push_queue.put(batch)
+    
+    @staticmethod
+    async def flush() -> None:
+        """Push all queued items and wait until the background pusher is done."""
+        # Swap the buffer before awaiting so concurrent producers start a new batch
+        batch, ApifyAdapter._pending = ApifyAdapter._pending, []
+        ApifyAdapter._last_flush = time.monotonic()
+        
+        # Detach the pusher first: batches queued after this point start a new one
+        worker, queue = ApifyAdapter._push_worker, ApifyAdapter._push_queue
+        ApifyAdapter._push_worker = ApifyAdapter._push_queue = None
+        if worker is not None:
+            await queue.put(None)
+            await worker
+        
+        if batch:
+            await ApifyAdapter._push_or_record(batch)
+        if ApifyAdapter._local_file is not None:
+            ApifyAdapter._local_file.flush()
 
 
 # ============================================================================
@@ -64,47 +185,116 @@ class ApifyAdapter:
 class Config:
     """Dynamic configuration from Apify input."""
     
+    # Fixed attribute layout: smaller instances and faster reads on the hot path
+    __slots__ = (
+        "urls_list",
+        "max_pages",
+        "limit_per_page",
+        "delay_between_pages",
+        "max_concurrency",
+        "page_concurrency",
+        "max_requests_per_second",
+        "max_age_days",
+        "age_cutoff",
+        "consecutive_old_limit",
+        "price_interval_size",
+        "split_price_intervals",
+        "proxy_configuration",
+    )
+    
     def __init__(self, input_data: Dict[str, Any]):
         """Initialize configuration from input data."""
+        get = input_data.get
+        
         # URLs list mode (always use this now)
-        self.urls_list = input_data.get("urls_list", [])
+        self.urls_list = get("urls_list", [])
         if isinstance(self.urls_list, str):
             self.urls_list = [self.urls_list]
         
         # Legacy support for old direct_url field
         if not self.urls_list and "direct_url" in input_data:
-            direct_url = input_data.get("direct_url", "").strip()
+            direct_url = get("direct_url", "").strip()
             if direct_url:
                 self.urls_list = [direct_url]
         
-        # URLs mode
-        self.direct_url = None
-        self.search_args = None
+        # Validate URLs once here (fail fast on bad input) so the scraping loop
+        # never has to re-check them per search
+        self.urls_list = Config.validate_urls(self.urls_list)
         
         # Pagination
-        self.max_pages = input_data.get("max_pages", 10)
-        self.limit_per_page = input_data.get("limit_per_page", 35)
-        self.delay_between_pages = input_data.get("delay_between_pages", 0)  # 0 = no delay for max speed
+        self.max_pages = get("max_pages", 10)
+        self.limit_per_page = get("limit_per_page", 35)
+        self.delay_between_pages = get("delay_between_pages", 0)  # 0 = no delay for max speed
+        
+        # Concurrency (number of search URLs scraped in parallel)
+        self.max_concurrency = max(1, get("max_concurrency", 4))
+        self.page_concurrency = max(1, get("page_concurrency", 1))  # Page requests in flight per search
+        
+        # Request rate limit shared by all searches (token bucket, 0 = unlimited)
+        self.max_requests_per_second = max(0, get("max_requests_per_second", 0))
         
         # Age filtering
-        self.max_age_days = input_data.get("max_age_days", 0)  # 0 = disabled
+        self.max_age_days = get("max_age_days", 0)  # 0 = disabled
+        # Cutoff kept as a SQL-format string: these sort chronologically, so ad
+        # dates can be compared to it without being parsed
+        self.age_cutoff = (
+            (datetime.now() - timedelta(days=self.max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+            if self.max_age_days > 0 else None
+        )
         self.consecutive_old_limit = 5
         
         # Price interval splitting (to avoid 100-page limit)
-        self.price_interval_size = input_data.get("price_interval_size", 50000)  # Default: 50k euros
-        self.split_price_intervals = input_data.get("split_price_intervals", True)  # Enable by default
+        self.price_interval_size = get("price_interval_size", 50000)  # Default: 50k euros
+        self.split_price_intervals = get("split_price_intervals", True)  # Enable by default
         
         # Proxy settings (Apify ProxyConfiguration)
-        self.proxy_configuration = input_data.get("proxyConfiguration")
+        self.proxy_configuration = get("proxyConfiguration")
+        
+        
+    @staticmethod
+    def validate_urls(urls: List[Any]) -> List[str]:
+        """
+        Check that every entry is a Leboncoin search URL (as the input schema requires).
         
+        Args:
+            urls: Raw urls_list entries from the input
+            
+        Returns:
+            Stripped URLs
+            
+        Raises:
+            ValueError: If any entry is not a Leboncoin URL with /recherche in its path
+        """
+        valid_urls = []
+        invalid_urls = []
+        for entry in urls:
+            url = entry.strip() if isinstance(entry, str) else None
+            parsed = urlparse(url) if url else None
+            if (parsed is not None
+                    and parsed.scheme in ("http", "https")
+                    and (parsed.netloc == "leboncoin.fr" or parsed.netloc.endswith(".leboncoin.fr"))
+                    and "/recherche" in parsed.path):
+                valid_urls.append(url)
+            else:
+                invalid_urls.append(entry)
         
+        if invalid_urls:
+            raise ValueError(
+                "Invalid urls_list entries (expected Leboncoin search URLs with /recherche in the path): "
+                + ", ".join(repr(url) for url in invalid_urls)
+            )
+        return valid_urls
+    
     def to_dict(self) -> Dict[str, Any]:
         """Export configuration as dictionary."""
         return {
-            "direct_url": self.direct_url,
+            "urls_list": self.urls_list,
             "max_pages": self.max_pages,
             "limit_per_page": self.limit_per_page,
             "delay_between_pages": self.delay_between_pages,
+            "max_concurrency": self.max_concurrency,
+            "page_concurrency": self.page_concurrency,
+            "max_requests_per_second": self.max_requests_per_second,
             "max_age_days": self.max_age_days
         }
 
@@ -190,8 +380,6 @@ class PriceIntervalSplitter:
             Values can be None for 'min' or 'max' keywords
         """
         try:
-            from urllib.parse import unquote
-            
             if '?' not in url:
                 return None
             
@@ -269,6 +457,9 @@ class PriceIntervalSplitter:
         # Split into intervals
         intervals = PriceIntervalSplitter.split_price_interval(actual_min, actual_max, interval_size)
         
+        # Split the URL around its price value(s) once, then only format the price per interval
+        url_parts = PriceIntervalSplitter._split_url_around_price(base_url)
+        
         # Generate URLs for each interval
         urls = []
         for i, (interval_min, interval_max) in enumerate(intervals):
@@ -277,69 +468,66 @@ class PriceIntervalSplitter:
             new_min = None if (i == 0 and original_min is None) else interval_min
             new_max = None if (i == len(intervals) - 1 and original_max is None) else interval_max
             
-            new_url = PriceIntervalSplitter._replace_price_in_url(
-                base_url, 
-                new_min,
-                new_max
-            )
-            urls.append(new_url)
+            if new_min is None and new_max is None:
+                # Should not happen, but keep original
+                urls.append(base_url)
+                continue
+            
+            price_value = PriceIntervalSplitter._format_price_value(new_min, new_max)
+            urls.append(price_value.join(url_parts))
         
         return urls
     
     @staticmethod
-    def _replace_price_in_url(url: str, new_min: Optional[int], new_max: Optional[int]) -> str:
+    def _format_price_value(new_min: Optional[int], new_max: Optional[int]) -> str:
         """
-        Replace price parameter in URL with new values.
+        Format a URL-encoded price range value.
         
         Args:
-            url: Original URL
-            new_min: New minimum price (None for 'min')
-            new_max: New maximum price (None for 'max')
+            new_min: Minimum price (None for 'min')
+            new_max: Maximum price (None for 'max')
             
         Returns:
-            URL with updated price parameter
+            Encoded price value ("min-1600", "2020-max" or "100-200")
         """
-        from urllib.parse import unquote, quote
+        if new_min is None:
+            return quote(f'min-{new_max}')
+        if new_max is None:
+            return quote(f'{new_min}-max')
+        return quote(f'{new_min}-{new_max}')
+    
+    @staticmethod
+    def _split_url_around_price(url: str) -> List[str]:
+        """
+        Split URL into the parts around every price value.
         
+        Args:
+            url: Original URL containing a price parameter
+            
+        Returns:
+            URL parts to join with the new price value (every price parameter is
+            replaced, other parameters are kept as-is)
+        """
         if '?' not in url:
-            return url
+            return [url]
         
         base_url = url.split('?')[0]
         query_string = url.split('?')[1]
         args = query_string.split('&')
         
-        new_args = []
-        price_replaced = False
-        
+        parts = []
+        current = []
         for arg in args:
-            if '=' not in arg:
-                new_args.append(arg)
-                continue
-            
-            key, value = arg.split('=', 1)
-            
-            if key == "price":
-                # Replace price parameter
-                if new_min is None and new_max is None:
-                    # Should not happen, but keep original
-                    new_args.append(arg)
-                elif new_min is None:
-                    # Format: "min-max_value"
-                    new_args.append(f"price={quote(f'min-{new_max}')}")
-                elif new_max is None:
-                    # Format: "min_value-max"
-                    new_args.append(f"price={quote(f'{new_min}-max')}")
-                else:
-                    # Format: "min_value-max_value"
-                    new_args.append(f"price={quote(f'{new_min}-{new_max}')}")
-                price_replaced = True
+            if '=' in arg and arg.split('=', 1)[0] == "price":
+                current.append("price=")
+                parts.append('&'.join(current))
+                current = [""]
             else:
-                new_args.append(arg)
-        
-        # Note: We should never add price if it didn't exist (this function is only called
-        # when price already exists in the URL, so price_replaced should always be True)
+                current.append(arg)
+        parts.append('&'.join(current))
         
-        return f"{base_url}?{'&'.join(new_args)}"
+        parts[0] = f"{base_url}?{parts[0]}"
+        return parts
 
 
 # ============================================================================
@@ -362,11 +550,81 @@ class LeboncoinURLParser:
         "relevance": lbc.Sort.RELEVANCE
     }
     
+    # (sort, order) URL combinations
+    SORT_ORDER_MAP = {
+        ("time", "desc"): lbc.Sort.NEWEST,
+        ("time", "asc"): lbc.Sort.OLDEST,
+        ("price", "desc"): lbc.Sort.EXPENSIVE,
+        ("price", "asc"): lbc.Sort.CHEAPEST
+    }
+    
     AD_TYPE_MAP = {
         "offer": lbc.AdType.OFFER,
         "demand": lbc.AdType.DEMAND
     }
     
+    # ------------------------------------------------------------------------
+    # Core URL parameter handlers: (search_config, decoded value) -> None
+    # ------------------------------------------------------------------------
+    
+    @staticmethod
+    def _handle_text(search_config: Dict[str, Any], value: str) -> None:
+        """Set the free-text query."""
+        search_config['text'] = value
+    
+    @staticmethod
+    def _handle_category(search_config: Dict[str, Any], value: str) -> None:
+        """Map the category id to an lbc.Category."""
+        # Fallback to TOUTES_CATEGORIES if not found
+        search_config['category'] = LeboncoinURLParser.CATEGORY_MAP.get(value, lbc.Category.TOUTES_CATEGORIES)
+    
+    @staticmethod
+    def _handle_locations(search_config: Dict[str, Any], value: str) -> None:
+        """Parse the locations parameter into lbc location objects."""
+        locations = LeboncoinURLParser._parse_locations(value)
+        if locations:
+            search_config['locations'] = locations
+    
+    @staticmethod
+    def _handle_owner_type(search_config: Dict[str, Any], value: str) -> None:
+        """Map the owner type (private/pro) to an lbc.OwnerType."""
+        if value in LeboncoinURLParser.OWNER_TYPE_MAP:
+            search_config['owner_type'] = LeboncoinURLParser.OWNER_TYPE_MAP[value]
+    
+    @staticmethod
+    def _handle_sort(search_config: Dict[str, Any], value: str) -> None:
+        """Keep the sort value until it can be combined with order."""
+        # Store sort parameter for later processing with order
+        search_config['_sort_value'] = value
+    
+    @staticmethod
+    def _handle_order(search_config: Dict[str, Any], value: str) -> None:
+        """Keep the order value until it can be combined with sort."""
+        # Store order parameter for later processing with sort
+        search_config['_order_value'] = value
+    
+    @staticmethod
+    def _handle_ad_type(search_config: Dict[str, Any], value: str) -> None:
+        """Map the ad type (offer/demand) to an lbc.AdType."""
+        if value in LeboncoinURLParser.AD_TYPE_MAP:
+            search_config['ad_type'] = LeboncoinURLParser.AD_TYPE_MAP[value]
+    
+    @staticmethod
+    def _handle_shippable(search_config: Dict[str, Any], value: str) -> None:
+        """Enable the shippable-only filter."""
+        if value == "1":
+            search_config['shippable'] = True
+    
+    @staticmethod
+    def _handle_page(search_config: Dict[str, Any], value: str) -> None:
+        """Ignore the page parameter (pages are driven by the scraper)."""
+        # Skip page parameter
+        pass
+    
+    # Dispatch table for core parameters (one dict lookup per URL parameter);
+    # any other key is a generic filter. Filled in after the class body
+    PARAM_HANDLERS: Dict[str, Callable[[Dict[str, Any], str], None]] = {}
+    
     @staticmethod
     def parse_url_to_search_config(url: str) -> Dict[str, Any]:
         """
@@ -380,8 +638,6 @@ class LeboncoinURLParser:
             Dictionary containing search configuration compatible with lbc.Client.search()
         """
         try:
-            from urllib.parse import unquote
-            
             # Extract query string and split by &
             if '?' not in url:
                 return {}
@@ -399,50 +655,10 @@ class LeboncoinURLParser:
                 key, value = arg.split('=', 1)
                 value = unquote(value)
                 
-                # Parse each parameter
-                if key == "text":
-                    search_config['text'] = value
-                    
-                elif key == "category":
-                    try:
-                        category_id = str(value)  # Convert to string for mapping lookup
-                        if category_id in LeboncoinURLParser.CATEGORY_MAP:
-                            search_config['category'] = LeboncoinURLParser.CATEGORY_MAP[category_id]
-                        else:
-                            # Fallback to TOUTES_CATEGORIES if not found
-                            search_config['category'] = lbc.Category.TOUTES_CATEGORIES
-                    except ValueError:
-                        pass
-                        
-                elif key == "locations":
-                    locations = LeboncoinURLParser._parse_locations(value)
-                    if locations:
-                        search_config['locations'] = locations
-                        
-                elif key == "owner_type":
-                    if value in LeboncoinURLParser.OWNER_TYPE_MAP:
-                        search_config['owner_type'] = LeboncoinURLParser.OWNER_TYPE_MAP[value]
-                        
-                elif key == "sort":
-                    # Store sort parameter for later processing with order
-                    search_config['_sort_value'] = value
-                        
-                elif key == "order":
-                    # Store order parameter for later processing with sort
-                    search_config['_order_value'] = value
-                            
-                elif key == "ad_type":
-                    if value in LeboncoinURLParser.AD_TYPE_MAP:
-                        search_config['ad_type'] = LeboncoinURLParser.AD_TYPE_MAP[value]
-                        
-                elif key == "shippable":
-                    if value == "1":
-                        search_config['shippable'] = True
-                        
-                elif key == "page":
-                    # Skip page parameter
-                    continue
-                    
+                # Core parameters go through the dispatch table
+                handler = LeboncoinURLParser.PARAM_HANDLERS.get(key)
+                if handler is not None:
+                    handler(search_config, value)
                 else:
                     # Generic parameter - add to kwargs filters
                     parsed_value = LeboncoinURLParser._parse_generic_value(value)
@@ -567,8 +783,8 @@ class LeboncoinURLParser:
     def _get_city_coordinates(city_name: str, postal_code: str = "") -> Dict[str, float]:
         """Get coordinates for a city using free API."""
         try:
-            import requests
-            import time
+            if requests is None:
+                raise ImportError("requests is not installed")
             
             # Build search query for API Adresse (data.gouv.fr)
             query_parts = []
@@ -615,8 +831,8 @@ class LeboncoinURLParser:
     def _get_coordinates_nominatim(query: str) -> Dict[str, float]:
         """Fallback method using Nominatim (OpenStreetMap)."""
         try:
-            import requests
-            import time
+            if requests is None:
+                raise ImportError("requests is not installed")
             
             # Nominatim API (OpenStreetMap) - free but with rate limiting
             url = "https://nominatim.openstreetmap.org/search"
@@ -658,14 +874,9 @@ class LeboncoinURLParser:
         
         if sort_value and order_value:
             # Handle specific combinations
-            if sort_value == "time" and order_value == "desc":
-                search_config['sort'] = lbc.Sort.NEWEST
-            elif sort_value == "time" and order_value == "asc":
-                search_config['sort'] = lbc.Sort.OLDEST
-            elif sort_value == "price" and order_value == "desc":
-                search_config['sort'] = lbc.Sort.EXPENSIVE
-            elif sort_value == "price" and order_value == "asc":
-                search_config['sort'] = lbc.Sort.CHEAPEST
+            sort = LeboncoinURLParser.SORT_ORDER_MAP.get((sort_value, order_value))
+            if sort is not None:
+                search_config['sort'] = sort
             else:
                 # Fallback to default mapping
                 if sort_value in LeboncoinURLParser.SORT_MAP:
@@ -717,6 +928,21 @@ class LeboncoinURLParser:
             return value
 
 
+# Populated from the class attributes so the table holds plain functions
+# (raw staticmethod objects are only callable on Python 3.10+)
+LeboncoinURLParser.PARAM_HANDLERS.update({
+    "text": LeboncoinURLParser._handle_text,
+    "category": LeboncoinURLParser._handle_category,
+    "locations": LeboncoinURLParser._handle_locations,
+    "owner_type": LeboncoinURLParser._handle_owner_type,
+    "sort": LeboncoinURLParser._handle_sort,
+    "order": LeboncoinURLParser._handle_order,
+    "ad_type": LeboncoinURLParser._handle_ad_type,
+    "shippable": LeboncoinURLParser._handle_shippable,
+    "page": LeboncoinURLParser._handle_page,
+})
+
+
 
 
 # ============================================================================
@@ -726,44 +952,87 @@ class LeboncoinURLParser:
 class DataProcessor:
     """Process and transform ad data."""
     
+    # Accepted input formats for normalize_datetime (built once, not per call)
+    DATETIME_FORMATS = (
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S.%f",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%d",
+    )
+    
+    # ISO-like dates (optionally with 'T' separator and fraction, or date only),
+    # rewritten to SQL format by slicing instead of a strptime round-trip
+    ISO_DATETIME_RE = re.compile(r"(\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}:\d{2})(?:\.\d{1,6})?)?")
     
     @staticmethod
-    def normalize_datetime(date_string: Optional[str]) -> Optional[str]:
-        """Normalize datetime to SQL format."""
-        if not date_string:
-            return None
-        
-        formats = [
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S.%f",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d",
-        ]
+    @functools.lru_cache(maxsize=8192)
+    def to_sql_datetime(date_string: str) -> Optional[str]:
+        """Convert a date string to SQL format, or None if it is not a valid date (memoized)."""
+        match = DataProcessor.ISO_DATETIME_RE.fullmatch(date_string)
+        if match:
+            sql_date = f"{match[1]} {match[2] or '00:00:00'}"
+            # The regex only checks the shape: reject impossible dates (2024-02-30, 25:00:00)
+            try:
+                datetime.fromisoformat(sql_date)
+                return sql_date
+            except ValueError:
+                return None
         
-        for fmt in formats:
+        for fmt in DataProcessor.DATETIME_FORMATS:
             try:
                 date_obj = datetime.strptime(date_string, fmt)
                 return date_obj.strftime("%Y-%m-%d %H:%M:%S")
             except ValueError:
                 continue
         
-        return date_string
+        return None
     
     @staticmethod
-    def is_ad_too_old(date_string: Optional[str], max_age_days: float) -> bool:
-        """Check if ad is older than threshold."""
-        if max_age_days <= 0:
-            return False
-        
+    def normalize_datetime(date_string: Optional[str]) -> Optional[str]:
+        """Normalize datetime to SQL format (unparseable strings are returned unchanged)."""
         if not date_string:
+            return None
+        return DataProcessor.to_sql_datetime(date_string) or date_string
+    
+    @staticmethod
+    def is_ad_too_old(date_value: Any, cutoff: Optional[str]) -> bool:
+        """
+        Check if ad is older than the age cutoff.
+        
+        Args:
+            date_value: Ad date as string or datetime
+            cutoff: Oldest accepted date as SQL-format string (None disables the filter)
+            
+        Returns:
+            True if the ad date is before the cutoff
+        """
+        if cutoff is None or not date_value:
             return False
         
-        try:
-            ad_date = datetime.strptime(date_string, "%Y-%m-%d %H:%M:%S")
-            cutoff = datetime.now() - timedelta(days=max_age_days)
-            return ad_date < cutoff
-        except ValueError:
+        if isinstance(date_value, datetime):
+            date_value = date_value.strftime("%Y-%m-%d %H:%M:%S")
+        elif isinstance(date_value, str):
+            date_value = DataProcessor.to_sql_datetime(date_value)
+            if date_value is None:
+                # Invalid dates are never considered too old
+                return False
+        else:
             return False
+        
+        # SQL-format strings sort chronologically: plain string comparison
+        return date_value < cutoff
+    
+    # Exact types stored as-is: callers test these inline to skip a converter call
+    SCALAR_TYPES = frozenset((str, int, float, bool))
+    
+    # Converters for container/datetime values, keyed by exact type (one dict
+    # probe instead of an if/elif chain; names resolve at call time)
+    TYPE_CONVERTERS = {
+        list: lambda value: [DataProcessor.convert_to_serializable(item) for item in value],
+        tuple: lambda value: [DataProcessor.convert_to_serializable(item) for item in value],
+        dict: lambda value: {k: DataProcessor.convert_to_serializable(v) for k, v in value.items()},
+        datetime: lambda value: value.strftime("%Y-%m-%d %H:%M:%S"),
+    }
     
     @staticmethod
     def convert_to_serializable(value: Any) -> Any:
@@ -772,27 +1041,26 @@ class DataProcessor:
         if value is None or isinstance(value, (str, int, float, bool)):
             return value
         
-        value_type = type(value)
-        
         # Fast path for collections
-        if value_type is list:
-            return [DataProcessor.convert_to_serializable(item) for item in value]
-        elif value_type is tuple:
-            return [DataProcessor.convert_to_serializable(item) for item in value]
-        elif value_type is dict:
-            return {k: DataProcessor.convert_to_serializable(v) for k, v in value.items()}
-        elif value_type is datetime:
-            return value.strftime("%Y-%m-%d %H:%M:%S")
-        elif hasattr(value, '__dict__'):
-            # For custom objects, use __dict__ directly (faster)
-            result = {}
-            for attr_name, attr_value in value.__dict__.items():
-                if not attr_name.startswith('_') and attr_value is not None:
-                    result[attr_name] = DataProcessor.convert_to_serializable(attr_value)
-            return result
-        else:
+        converter = DataProcessor.TYPE_CONVERTERS.get(type(value))
+        if converter is not None:
+            return converter(value)
+        
+        # For custom objects, use __dict__ directly (faster); EAFP since
+        # nested lbc objects (location, attributes) nearly always have one
+        try:
+            attrs = value.__dict__
+        except AttributeError:
             # Fallback to string
             return str(value)
+        
+        scalar_types = DataProcessor.SCALAR_TYPES
+        return {
+            attr_name: attr_value if type(attr_value) in scalar_types
+            else DataProcessor.convert_to_serializable(attr_value)
+            for attr_name, attr_value in attrs.items()
+            if attr_value is not None and attr_name[:1] != '_'
+        }
 
 
 # ============================================================================
@@ -803,34 +1071,82 @@ class AdTransformer:
     """Transform raw ads to structured format."""
     
     @staticmethod
-    def create_detailed_ad(ad: Any, search_context: Dict[str, Any]) -> Dict[str, Any]:
+    def create_detailed_ad(ad: Any, search_context: Dict[str, Any], scraped_at: Optional[str] = None) -> Dict[str, Any]:
         """Create detailed ad dictionary with ALL available fields (optimized)."""
+        # Bind the converter once instead of resolving it for every field
+        convert = DataProcessor.convert_to_serializable
+        scalar_types = DataProcessor.SCALAR_TYPES
+        
         # Use __dict__ directly for speed (much faster than dir())
-        if hasattr(ad, '__dict__'):
-            ad_data = {}
-            for attr_name, value in ad.__dict__.items():
-                if not attr_name.startswith('_') and value is not None:
-                    ad_data[attr_name] = DataProcessor.convert_to_serializable(value)
+        ad_attrs = getattr(ad, '__dict__', None)
+        if ad_attrs is not None:
+            # Single comprehension; most ad fields are plain scalars stored without a call
+            ad_data = {
+                attr_name: value if type(value) in scalar_types else convert(value)
+                for attr_name, value in ad_attrs.items()
+                if value is not None and attr_name[:1] != '_'
+            }
         else:
             # Fallback to dir() if no __dict__
             ad_data = {}
             for attr_name in dir(ad):
-                if not attr_name.startswith('_') and not callable(getattr(ad, attr_name)):
-                    value = getattr(ad, attr_name, None)
-                    if value is not None:
-                        ad_data[attr_name] = DataProcessor.convert_to_serializable(value)
-        
-        # Add metadata (reuse same timestamp string)
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ad_data["scraped_at"] = now_str
-        ad_data["search_category"] = search_context.get("category", "Unknown")
-        ad_data["search_location"] = search_context.get("location", "Unknown")
-        ad_data["search_url"] = search_context.get("search_url", "Unknown")
+                if attr_name.startswith('_'):
+                    continue
+                # Single attribute read per name (filter and convert in one pass)
+                value = getattr(ad, attr_name, None)
+                if value is not None and not callable(value):
+                    ad_data[attr_name] = convert(value)
+        
+        # Add metadata (timestamp is computed once per page by the caller,
+        # search_* fields are prebuilt once per search)
+        ad_data["scraped_at"] = scraped_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ad_data.update(search_context)
         
         return ad_data
     
 
 
+# ============================================================================
+# RATE LIMITING
+# ============================================================================
+
+class RateLimiter:
+    """Token-bucket request limiter with AIMD backoff (shared by all searches)."""
+    
+    # Lowest rate reached when backing off, in requests per second
+    MIN_RATE = 0.1
+    
+    def __init__(self, max_rate: float):
+        """Initialize limiter at its maximum rate (requests per second)."""
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a request token is available, then consume it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+    
+    def back_off(self) -> None:
+        """Halve the rate after an anti-bot block (multiplicative decrease)."""
+        # The floor never exceeds the configured maximum
+        self.rate = max(min(self.MIN_RATE, self.max_rate), self.rate / 2)
+    
+    def recover(self) -> None:
+        """Raise the rate back towards the maximum after a success (additive increase)."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
 # ============================================================================
 # SCRAPING ENGINE
 # ============================================================================
@@ -845,6 +1161,7 @@ class ScraperEngine:
         self.client = None
         self.seen_ids = set()
         self.total_ads_available = None  # Total ads available on Leboncoin
+        self.rate_limiter = RateLimiter(config.max_requests_per_second) if config.max_requests_per_second > 0 else None
         self.stats = {
             "total_ads": 0,
             "unique_ads": 0,
@@ -859,9 +1176,8 @@ class ScraperEngine:
         proxy_url = None
         
         # Try to use Apify ProxyConfiguration
-        if self.config.proxy_configuration:
+        if self.config.proxy_configuration and Actor is not None:
             try:
-                from apify import Actor
                 proxy_config = await Actor.create_proxy_configuration(
                     actor_proxy_input=self.config.proxy_configuration
                 )
@@ -874,7 +1190,6 @@ class ScraperEngine:
         # Initialize client with or without proxy
         if proxy_url:
             # Parse proxy URL to extract components for lbc.Proxy
-            from urllib.parse import urlparse
             parsed = urlparse(proxy_url)
             proxy = lbc.Proxy(
                 host=parsed.hostname,
@@ -889,116 +1204,131 @@ class ScraperEngine:
             self.logger.info("Leboncoin client initialized without proxy")
     
     
-    def _scrape_single_page(self, page_num: int, search_url: str = None) -> tuple[List[Dict[str, Any]], bool]:
+    @staticmethod
+    def _build_search_context(search_args: Dict[str, Any], search_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the static search context attached to every ad of a search.
+        
+        Args:
+            search_args: Parsed search arguments for the current URL
+            search_url: Original URL used for this search (optional)
+            
+        Returns:
+            Dictionary of output fields (search_category, search_location, search_url)
+        """
+        category = search_args.get('category')
+        category_name = (
+            getattr(category, 'name', None)
+            or getattr(category, 'value', None)
+            or (category if isinstance(category, str) else "Unknown")
+        ) if category else "Unknown"
+        
+        # Use the first location of the search, if any
+        locations = search_args.get('locations')
+        first_loc = locations[0] if locations else None
+        location_name = (
+            getattr(first_loc, 'city', None)
+            or getattr(first_loc, 'name', None)
+            or "Unknown"
+        ) if first_loc else "Unknown"
+        
+        return {
+            "search_category": category_name,
+            "search_location": location_name,
+            "search_url": search_url if search_url else "Unknown"
+        }
+    
+    async def _search_page(self, search_args: Dict[str, Any], page_num: int) -> Any:
+        """Run one lbc search request, waiting for the rate limiter if enabled."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        # lbc.Client is synchronous: run the HTTP call in a worker thread so
+        # other searches (and other pages) keep progressing on the event loop
+        return await asyncio.to_thread(self.client.search, **search_args, page=page_num)
+    
+    def _fetch_page(self, search_args: Dict[str, Any], page_num: int) -> asyncio.Task:
+        """Start fetching one result page in the background and return its task."""
+        return asyncio.create_task(self._search_page(search_args, page_num))
+    
+    async def _scrape_single_page(self, fetch: asyncio.Task, page_num: int, search_context: Dict[str, Any]) -> tuple[List[Dict[str, Any]], bool]:
         """
-        Scrape a single page using parsed search arguments.
+        Scrape a single page from its (possibly already running) fetch task.
         Returns (ads_list, should_stop).
         
         Args:
+            fetch: Task returned by _fetch_page for this page
             page_num: Page number to scrape
-            search_url: Original URL used for this search (optional)
+            search_context: Static search context built once per URL
             
         Returns:
             Tuple of (list of ads, boolean indicating if scraping should stop)
         """
         try:
-            # Use parsed search arguments instead of URL
-            search_args = self.config.search_args.copy()
-            search_args['page'] = page_num
-            search_args['limit'] = self.config.limit_per_page
-            
-            result = self.client.search(**search_args)
+            result = await fetch
+            if self.rate_limiter is not None:
+                self.rate_limiter.recover()
             
-            # Store and log total available ads on first page only
-            if page_num == 1 and hasattr(result, 'max_pages') and hasattr(result, 'total'):
-                self.total_ads_available = result.total
-                self.logger.info(f"Found {result.total} ads in {result.max_pages} pages")
+            # Accumulate and log total available ads on first page only
+            if page_num == 1:
+                total = getattr(result, 'total', None)
+                max_result_pages = getattr(result, 'max_pages', None)
+                if total is not None and max_result_pages is not None:
+                    self.total_ads_available = (self.total_ads_available or 0) + total
+                    self.logger.info(f"Found {total} ads in {max_result_pages} pages")
             
             # Fast exit if no ads
-            if not hasattr(result, 'ads') or not result.ads:
+            ads = getattr(result, 'ads', None)
+            if not ads:
                 return [], True
             
             page_ads = []
             old_ads_count = 0
             
-            # Static search context (reused for all ads on this page)
-            # Extract category and location from search args
-            category_name = "Unknown"
-            location_name = "Unknown"
-            
-            if hasattr(search_args, 'get'):
-                category = search_args.get('category')
-                if category:
-                    if hasattr(category, 'name'):
-                        category_name = category.name
-                    elif hasattr(category, 'value'):
-                        category_name = category.value
-                    elif isinstance(category, str):
-                        category_name = category
-                
-                # Try to get location from locations array
-                locations = search_args.get('locations', [])
-                if locations and len(locations) > 0:
-                    first_loc = locations[0]
-                    if hasattr(first_loc, 'city'):
-                        location_name = first_loc.city
-                    elif hasattr(first_loc, 'name'):
-                        location_name = first_loc.name
-            
-            search_context = {
-                "category": category_name, 
-                "location": location_name,
-                "search_url": search_url if search_url else "Unknown"
-            }
+            # Same scrape timestamp for every ad of the page
+            scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # Bind loop invariants once (avoids attribute lookups per ad)
+            seen_ids = self.seen_ids
+            stats = self.stats
+            age_cutoff = self.config.age_cutoff
+            consecutive_old_limit = self.config.consecutive_old_limit
+            is_ad_too_old = DataProcessor.is_ad_too_old
+            create_detailed_ad = AdTransformer.create_detailed_ad
+            append_ad = page_ads.append
             
             # Process ads
-            for ad in result.ads:
+            for ad in ads:
                 # Fast validation
-                if not hasattr(ad, 'id') or not ad.id:
+                ad_id = getattr(ad, 'id', None)
+                if not ad_id:
                     continue
                 
                 # Skip duplicates (set lookup is O(1))
-                if ad.id in self.seen_ids:
-                    self.stats["duplicates"] += 1
+                if ad_id in seen_ids:
+                    stats["duplicates"] += 1
                     continue
                 
                 # Age filter (optimized)
                 # Uses index_date (last update) if available, otherwise first_publication_date
-                if self.config.max_age_days > 0:
-                    date_to_check = None
-                    
+                if age_cutoff is not None:
                     # Prefer index_date (last update) over first_publication_date
-                    if hasattr(ad, 'index_date') and ad.index_date:
-                        date_to_check = ad.index_date
-                    elif hasattr(ad, 'first_publication_date') and ad.first_publication_date:
-                        date_to_check = ad.first_publication_date
+                    date_to_check = getattr(ad, 'index_date', None) or getattr(ad, 'first_publication_date', None)
                     
-                    if date_to_check:
-                        try:
-                            # Handle both datetime objects and string dates
-                            check_date = date_to_check
-                            if isinstance(check_date, str):
-                                check_date = datetime.strptime(check_date, "%Y-%m-%d %H:%M:%S")
-                            
-                            ad_age_days = (datetime.now() - check_date).days
-                            if ad_age_days > self.config.max_age_days:
-                                old_ads_count += 1
-                                if old_ads_count >= self.config.consecutive_old_limit:
-                                    return page_ads, True
-                                continue
-                        except (ValueError, TypeError, AttributeError):
-                            # Skip if date parsing fails
-                            pass
+                    if is_ad_too_old(date_to_check, age_cutoff):
+                        old_ads_count += 1
+                        if old_ads_count >= consecutive_old_limit:
+                            return page_ads, True
+                        continue
                     old_ads_count = 0
                 
                 # Transform and add (bulk processing, no individual error handling for speed)
                 try:
-                    ad_data = AdTransformer.create_detailed_ad(ad, search_context)
-                    self.seen_ids.add(ad.id)
-                    page_ads.append(ad_data)
+                    ad_data = create_detailed_ad(ad, search_context, scraped_at)
+                    seen_ids.add(ad_id)
+                    append_ad(ad_data)
                 except Exception:
                     # Silent skip for speed - only count error
-                    self.stats["errors"] += 1
+                    stats["errors"] += 1
             
             return page_ads, False
             
@@ -1006,81 +1336,151 @@ class ScraperEngine:
             error_msg = str(e)
             if "Datadome" in error_msg:
                 self.logger.error(f"Access blocked by Datadome (anti-bot) on page {page_num}")
+                if self.rate_limiter is not None:
+                    previous_rate = self.rate_limiter.rate
+                    self.rate_limiter.back_off()
+                    if self.rate_limiter.rate < previous_rate:
+                        self.logger.warning(f"Request rate lowered to {self.rate_limiter.rate:.2f}/s")
             else:
                 self.logger.error(f"Failed to scrape page {page_num}: {error_msg}")
             self.stats["errors"] += 1
             return [], True
 
-    async def scrape_from_url(self) -> List[Dict[str, Any]]:
-        """Scrape using search arguments (sequential, optimized for speed)."""
-        all_ads = []
+    async def scrape_from_url(self, search_args: Dict[str, Any], search_url: Optional[str] = None) -> int:
+        """
+        Scrape all pages of a single search.
+        Page 1 is fetched on its own to learn how many pages the search has; later
+        pages are then fetched up to page_concurrency at a time (never past that
+        page count) and processed in order. Ads are pushed to the dataset in
+        batches and not kept in memory.
+        
+        Args:
+            search_args: Parsed search arguments for this URL
+            search_url: Original URL used for this search (optional)
+            
+        Returns:
+            Number of ads extracted for this search
+        """
+        ads_count = 0
         
         # If max_pages is 0, scrape all available pages (practically unlimited)
         max_pages = self.config.max_pages if self.config.max_pages > 0 else 99999
         
         # Validate search arguments
-        if not self.config.search_args:
+        if not search_args:
             self.logger.error("No search arguments provided")
             self.stats["errors"] += 1
-            return all_ads
+            return ads_count
         
         self.logger.info("Search arguments validated - will be passed directly to lbc library")
+        
+        # Search context is the same for every page of this URL
+        search_context = self._build_search_context(search_args, search_url)
+        
+        # Page-invariant search arguments, built once (only page changes per request)
+        search_args = {**search_args, 'limit': self.config.limit_per_page}
+        search_args.pop('page', None)
 
-        # Sequential scraping - optimized batching
-        page = 1
-        batch_size = 10  # Larger batch for fewer I/O operations
-        batch_ads = []
+        # Up to page_concurrency page requests run ahead; pages are still
+        # processed in order (ads are coalesced across searches by ApifyAdapter)
+        pending = collections.deque()  # (page number, fetch task)
+        next_page = 1
+        # Only page 1 until the search's own page count is known
+        fetch_limit = 1
+        pages_scraped = 0
+        
+        def schedule_fetches() -> None:
+            nonlocal next_page
+            while len(pending) < self.config.page_concurrency and next_page <= fetch_limit:
+                pending.append((next_page, self._fetch_page(search_args, next_page)))
+                next_page += 1
         
         self.logger.info("Starting scraping")
         
-        while page <= max_pages:
-            # Scrape page
-            page_ads, should_stop = self._scrape_single_page(page, search_url=self.config.direct_url)
-            
-            if page_ads:
-                all_ads.extend(page_ads)
-                batch_ads.extend(page_ads)
-                self.stats["total_ads"] += len(page_ads)
-                self.stats["unique_ads"] += len(page_ads)
-                self.stats["pages_processed"] += 1
-                # Log every page
-                self.logger.info(f"Page {page}: {len(page_ads)} ads extracted")
-            
-            # Push batch when full or stopping
-            if len(batch_ads) >= batch_size * self.config.limit_per_page or should_stop:
-                if batch_ads:
-                    await ApifyAdapter.push_data(batch_ads)
-                    batch_ads = []
-            
-            # Check stop conditions
-            if should_stop or not page_ads or page >= max_pages:
-                break
-            
-            page += 1
-            # Only sleep if delay configured (avoid unnecessary async overhead)
-            if self.config.delay_between_pages > 0:
+        try:
+            schedule_fetches()
+            while pending:
+                page, fetch = pending.popleft()
+                
+                await asyncio.wait((fetch,))
+                fetch_ok = not fetch.cancelled() and fetch.exception() is None
+                
+                # Cap the fan-out at the number of pages the search actually has
+                if page == 1 and fetch_ok:
+                    result_pages = getattr(fetch.result(), 'max_pages', None)
+                    if result_pages:
+                        max_pages = min(max_pages, result_pages)
+                    fetch_limit = max_pages
+                
+                # Prefetch: once this page has arrived, request the next one and
+                # yield so its worker thread starts downloading while this page is
+                # processed (skipped on failure, and when a delay between pages is
+                # configured, to keep the spacing)
+                if fetch_ok and self.config.delay_between_pages <= 0:
+                    schedule_fetches()
+                    await asyncio.sleep(0)
+                
+                # Scrape page
+                page_ads, should_stop = await self._scrape_single_page(fetch, page, search_context)
+                
+                if page_ads:
+                    ads_count += len(page_ads)
+                    pages_scraped += 1
+                    self.stats["total_ads"] += len(page_ads)
+                    self.stats["unique_ads"] += len(page_ads)
+                    self.stats["pages_processed"] += 1
+                    # Log every page
+                    self.logger.info(f"Page {page}: {len(page_ads)} ads extracted")
+                    await ApifyAdapter.push_batched(page_ads)
+                
+                # Check stop conditions
+                if should_stop or not page_ads or page >= max_pages:
+                    break
+                
+                # Only sleep if delay configured (avoid unnecessary async overhead)
+                if self.config.delay_between_pages > 0:
+                    await asyncio.sleep(self.config.delay_between_pages)
+                schedule_fetches()
+        finally:
+            # Drop fetches for pages past the stop point (and retrieve their errors)
+            for _, fetch in pending:
+                fetch.cancel()
+            await asyncio.gather(*(fetch for _, fetch in pending), return_exceptions=True)
+        
+        self.logger.info(f"Scraping completed: {ads_count} ads extracted from {pages_scraped} pages")
+        return ads_count
+    
+    async def _scrape_url_with_semaphore(self, semaphore: asyncio.Semaphore, idx: int, total: int, url: str) -> int:
+        """Scrape one search URL while holding a concurrency slot."""
+        async with semaphore:
+            self.logger.info(f"Processing URL {idx}/{total}: {url}")
+            
+            # Parse URL to search args (may geocode locations over HTTP)
+            search_args = await asyncio.to_thread(LeboncoinURLParser.parse_url_to_search_config, url)
+            
+            # Log parsed arguments for debugging
+            self.logger.info(f"Search arguments from URL {idx}: {search_args}")
+            
+            # Scrape this URL
+            url_ads_count = await self.scrape_from_url(search_args, url)
+            
+            # Log progress
+            self.logger.info(f"URL {idx} completed: {url_ads_count} ads extracted")
+            
+            # Small delay between URLs (keeps the slot so the request rate stays bounded)
+            if idx < total and self.config.delay_between_pages > 0:
                 await asyncio.sleep(self.config.delay_between_pages)
-        
-        # Push remaining ads
-        if batch_ads:
-            await ApifyAdapter.push_data(batch_ads)
-        
-        # Display total available vs scraped
-        if self.total_ads_available is not None:
-            self.logger.info(f"Total ads available: {self.total_ads_available} | Scraped: {len(all_ads)} from {self.stats['pages_processed']} pages")
-        else:
-            self.logger.info(f"Scraping completed: {len(all_ads)} ads extracted from {self.stats['pages_processed']} pages")
-        return all_ads
+            
+            return url_ads_count
     
     async def run(self) -> Dict[str, Any]:
-        """Execute scraping pipeline."""
+        """Execute scraping pipeline and return run summary (ads go to the dataset)."""
         self.logger.info("Starting scraper")
         
         # Initialize client once
         await self.initialize_client()
         
         # Check if multiple URLs mode
-        all_ads = []
         if self.config.urls_list:
             # Expand URLs by splitting price intervals if enabled
             expanded_urls = []
@@ -1100,40 +1500,38 @@ class ScraperEngine:
             # Multiple URLs mode (now with expanded price intervals)
             self.logger.info(f"Processing {len(expanded_urls)} URLs ({len(self.config.urls_list)} original, {len(expanded_urls) - len(self.config.urls_list)} from price splitting)")
             
-            for idx, url in enumerate(expanded_urls, 1):
-                self.logger.info(f"Processing URL {idx}/{len(expanded_urls)}: {url}")
-                
-                # Parse URL to search args
-                search_args = LeboncoinURLParser.parse_url_to_search_config(url)
-                
-                # Log parsed arguments for debugging
-                self.logger.info(f"Search arguments from URL {idx}: {search_args}")
-                
-                # Temporarily override config search args
-                original_search_args = self.config.search_args
-                original_direct_url = self.config.direct_url
-                
-                self.config.search_args = search_args
-                self.config.direct_url = url
-                
-                # Scrape this URL
-                url_ads = await self.scrape_from_url()
-                all_ads.extend(url_ads)
-                
-                # Log progress
-                self.logger.info(f"URL {idx} completed: {len(url_ads)} ads extracted")
-                
-                # Restore original config
-                self.config.search_args = original_search_args
-                self.config.direct_url = original_direct_url
-                
-                # Small delay between URLs
-                if idx < len(expanded_urls) and self.config.delay_between_pages > 0:
-                    await asyncio.sleep(self.config.delay_between_pages)
+            # Scrape URLs concurrently, bounded by max_concurrency
+            semaphore = asyncio.Semaphore(self.config.max_concurrency)
+            try:
+                results = await asyncio.gather(
+                    *(
+                        self._scrape_url_with_semaphore(semaphore, idx, len(expanded_urls), url)
+                        for idx, url in enumerate(expanded_urls, 1)
+                    ),
+                    return_exceptions=True
+                )
+            finally:
+                # Push remaining ads (also on errors, so scraped ads are not lost)
+                await ApifyAdapter.flush()
+            
+            # Ads from failed dataset pushes were lost: do not report them as extracted
+            failed_batches, failed_items = ApifyAdapter.pop_push_failures()
+            if failed_items:
+                self.logger.error(f"{failed_items} ads could not be pushed to the dataset ({failed_batches} failed pushes)")
+                self.stats["errors"] += failed_batches
+                self.stats["total_ads"] -= failed_items
+                self.stats["unique_ads"] -= failed_items
+            
+            # Report failed URLs (ads were already pushed as they were scraped)
+            for idx, url_result in enumerate(results, 1):
+                if isinstance(url_result, Exception):
+                    self.logger.error(f"URL {idx} failed: {url_result}")
+                    self.stats["errors"] += 1
         
         if not self.config.urls_list:
+            # Still return the usual summary so callers can report an empty run
             self.logger.error("No URLs provided in urls_list")
-            return []
+            self.stats["errors"] += 1
         
         # Final summary
         if self.total_ads_available is not None:
@@ -1143,7 +1541,6 @@ class ScraperEngine:
         
         return {
             "stats": self.stats,
-            "ads": all_ads,
             "config": self.config.to_dict(),
             "total_ads_available": self.total_ads_available
         }
@@ -1156,10 +1553,7 @@ class ScraperEngine:
 
 async def main() -> None:
     """Main entry point for Apify actor."""
-    try:
-        # Try Apify actor
-        from apify import Actor
-        
+    if Actor is not None:
         async with Actor:
             # Get input
             input_data = await Actor.get_input() or {}
@@ -1178,8 +1572,7 @@ async def main() -> None:
             
             # Set output
             await Actor.set_value('OUTPUT', result)
-            
-    except ImportError:
+    else:
         # Local execution fallback
         input_data = await ApifyAdapter.get_input()
         config = Config(input_data)
@@ -1193,13 +1586,15 @@ async def main() -> None:
             logger.info(f"TOTAL ADS FOUND IN SEARCH: {result['total_ads_available']}")
         
         # Save local output
-        with open("scraper_results.json", "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        with open("scraper_results.json", "wb") as f:
+            f.write(ApifyAdapter.dumps(result, indent=True))
         
-        logger.info("Results saved to: scraper_results.json")
+        logger.info(f"Run summary saved to: scraper_results.json | Ads saved to: {ApifyAdapter.LOCAL_OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 